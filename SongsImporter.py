@@ -2,25 +2,25 @@ from xml.etree import ElementTree
 from songimport import *
 import os
 
+# number of songs written per transaction in `bulk_dump`.
+BULK_CHUNK_SIZE = 10000
+
 def dumps(txt):
     pass
 
-def generate_lyrics(*args):
-    lyrics = ""
+def generate_lyrics(*groups):
+    """groups are (lines_elements, kind) pairs, kind being "verse" or "chorus"."""
+    parts = []
+    append = parts.append
     count = 1
-    for elements in args:
-        for element in elements:
-            line = element[0]
-            split_txt = line.text.splitlines()
-            txt = [txt.strip() for txt in split_txt]
-            temp = count
-            if element[1] == "chorus":
-                count = "Chorus"
-            lyrics += str(count) + "." + "\n".join(txt) + "\n\n"
-            count = temp
+    for elements, kind in groups:
+        for line in elements:
+            text = line.text or "" # empty <lines/> has no text.
+            label = "Chorus" if kind == "chorus" else str(count)
+            body = "\n".join(txt.strip() for txt in text.splitlines())
+            append(f"{label}.{body}\n\n")
             count += 1
-            del temp
-    return lyrics
+    return "".join(parts)
 
 
 def backup(dbs_dir):
@@ -28,23 +28,87 @@ def backup(dbs_dir):
     songwords_db_path = os.path.join(dbs_dir, "SongWords.db")
     create_backup(songs_db_path, songwords_db_path)
 
+def parse_song(file: any):
+    """parse a song file into (title, author, copyright, ccli, lyrics)."""
+    fields = {}
+    lines_elements = []
+    chorus_elements = []
+    song_tag = None
+    verse = None # the <verse>/<chorus> of the song being read.
+    kind = None # its tag, reset once its <lines> is collected.
+    # open elements, only direct children are used, like `find`/`findall` did.
+    stack = []
+    # stream the file so only the current verse/chorus is kept in memory.
+    for event, elem in ElementTree.iterparse(file, events=("start", "end")):
+        if event == "start":
+            if song_tag is None:
+                if elem.tag == "song" and len(stack) == 1:
+                    song_tag = elem
+            elif stack[-1] is song_tag and elem.tag in ("verse", "chorus"):
+                verse, kind = elem, elem.tag
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if song_tag is None:
+            continue
+        if elem is song_tag:
+            break
+        parent = stack[-1]
+        if parent is song_tag:
+            if elem.tag in ("title", "author", "copyright", "ccli"):
+                fields.setdefault(elem.tag, elem.text)
+            elif elem is verse:
+                verse = kind = None
+                elem.clear()
+                song_tag.remove(elem) # free the processed sibling.
+        elif parent is verse and kind and elem.tag == "lines":
+            # collect the first lines as it closes, no second lookup from the verse.
+            (lines_elements if kind == "verse" else chorus_elements).append(elem)
+            kind = None
+
+    title = fields.get("title")
+    author = fields.get("author")
+    copyright_ = fields.get("copyright")
+    ccli = fields.get("ccli")
+    lyrics = generate_lyrics((lines_elements, "verse"), (chorus_elements, "chorus"))
+    return title, author, copyright_, ccli, lyrics
+
+
 def dump(file: any,  dbs_dir):
     """dump the file into the databases."""
-    tree = ElementTree.parse(open(file))
-    song_tag = tree.find("song")
-    title = song_tag.find("title").text
-    author = song_tag.find("author").text
-    copyright_ = song_tag.find("copyright").text
-    ccli = song_tag.find("ccli").text
-    lines_elements = [(verse.find("lines"), "verse") for verse in song_tag.findall("verse")]
-    chorus_elements = [(chorus.find("lines"), "chorus") for chorus in song_tag.findall("chorus")]
-    lyrics = generate_lyrics(lines_elements, chorus_elements)
-
+    title, author, copyright_, ccli, lyrics = parse_song(file)
     process_song(lyrics, title, author, copyright_, dbs_dir, "./output")
 
 
-# dump("song.xml", "./Databases")
-song_words_db = "./Databases/SongWords.db"
-# show_db_tables(song_words_db)
-# print(return_db_tables())
-show_table_contents(song_words_db, "word")
+def bulk_dump(files, dbs_dir):
+    """dump many song files into the databases, batching the inserts into a few transactions."""
+    files = list(files)
+    songs_db_path = os.path.join(dbs_dir, "Songs.db")
+    songwords_db_path = os.path.join(dbs_dir, "SongWords.db")
+
+    # one connection with SongWords.db attached, each chunk is committed to both files at once.
+    conn = open_song_dbs(songs_db_path, songwords_db_path)
+    try:
+        for start in range(0, len(files), BULK_CHUNK_SIZE):
+            songs = [
+                (title, author, copyright_, lyrics_to_rtf(lyrics))
+                for title, author, copyright_, ccli, lyrics in map(parse_song, files[start:start + BULK_CHUNK_SIZE])
+            ]
+            new_songs, new_words = insert_songs(conn, songs)
+            print(f"Imported {new_songs} new songs, {new_words} lyrics ({start + len(songs)}/{len(files)}).")
+    finally:
+        conn.close()
+
+
+def main():
+    # dump("song.xml", "./Databases")
+    song_words_db = "./Databases/SongWords.db"
+    # show_db_tables(song_words_db)
+    # print(return_db_tables())
+    show_table_contents(song_words_db, "word")
+
+
+if __name__ == "__main__":
+    main()
+
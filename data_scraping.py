@@ -1,4 +1,8 @@
 import sqlite3
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+import base64
 import json
 import pprint
 from PIL import Image
@@ -6,43 +10,71 @@ from io import BytesIO
 import pandas as pd
 
 db_path = "out/main.db"
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-tables = cursor.fetchall()
-print(f"{len(tables)} Tables found in main.db")
-# for table in tables:
-#     print("-", table[0])
-    
-# print("\n")
-
-data = {"ews-data": {}}
-for table in tables:
-    table_name = table[0]
-    # print(f"--- Content of table: {table_name} ---")
-    data["ews-data"][table_name] = {}
+
+# image columns are left out of the table load and read on demand with `read_blob`.
+IMAGE_TYPES = ("jpeg", "png")
+
+
+def _read_table(db_path, table_name):
+    """read one table on its own read-only connection."""
+    conn = sqlite3.connect(db_path)
     try:
-        cursor.execute(f"SELECT * FROM {table_name};")
-        rows = cursor.fetchall()
-        
-        column_names = [description[0] for description in cursor.description]
-        for row in rows:
-            for idx, v in enumerate(row):
-                if column_names[idx] in list(data["ews-data"][table_name].keys()):
-                    data["ews-data"][table_name][column_names[idx]].append(v)
-                else:
-                    data["ews-data"][table_name][column_names[idx]] = [v]
-        if len(data["ews-data"][table_name]) <= 0:
-            del data["ews-data"][table_name]
-    except sqlite3.DatabaseError as e:
-        print("Could not read table {table_name}: {e}\n")
-        
-
-
-def display_data(dict_, include_ = ..., name="DATA"):
-    headings = list(dict_.keys())
-    df = pd.DataFrame(dict_)
+        conn.execute("PRAGMA query_only=1;")
+        conn.execute("PRAGMA mmap_size=268435456;")
+        quoted_name = table_name.replace('"', '""')
+        # named columns only for the schema lookup, the bulk read below stays on plain tuples.
+        info = conn.cursor()
+        info.row_factory = sqlite3.Row
+        columns = [
+            '"' + column["name"].replace('"', '""') + '"'
+            for column in info.execute(f'PRAGMA table_info("{quoted_name}");')
+            if column["type"].lower() not in IMAGE_TYPES
+        ]
+        # let pandas fill the columns directly instead of boxing every cell.
+        return pd.read_sql_query(f'SELECT {", ".join(columns)} FROM "{quoted_name}";', conn)
+    finally:
+        conn.close()
+
+
+def read_blob(db_path, table_name, column, rowid):
+    """read a single BLOB cell through an incremental blob handle."""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn.blobopen(table_name, column, rowid, readonly=True) as blob:
+            return blob.read()
+    finally:
+        conn.close()
+
+
+def open_thumbnail(db_path, table_name, rowid):
+    """decode the thumbnail image of a presentation/slide/resource row."""
+    return Image.open(BytesIO(read_blob(db_path, table_name, "thumbnail", rowid)))
+
+
+def load_data(db_path):
+    """read every non-empty table of the schedule database into a DataFrame."""
+    conn = sqlite3.connect(db_path)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")]
+    conn.close()
+    print(f"{len(tables)} Tables found in main.db")
+
+    # sqlite releases the GIL while stepping, so tables can be read in parallel.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {table_name: executor.submit(_read_table, db_path, table_name) for table_name in tables}
+
+    data = {"ews-data": {}}
+    for table_name, future in futures.items():
+        try:
+            df = future.result()
+            if not df.empty:
+                data["ews-data"][table_name] = df
+        except (sqlite3.DatabaseError, pd.errors.DatabaseError) as e:
+            print(f"Could not read table {table_name}: {e}\n")
+    return data
+
+
+def display_data(df, include_ = ..., name="DATA"):
+    headings = list(df.columns)
     print(headings)
     with pd.option_context(
     "display.max_rows", None,
@@ -52,20 +84,61 @@ def display_data(dict_, include_ = ..., name="DATA"):
 ):
         print(name.upper() + " TABLE")
         print(df[include_]) if include_ != ... else print(df.head())
-        
-# Close connection
-conn.close()
 
-table= "file"
-cursor.execute(f"PRAGMA foreign_key_list({table});")
-foreign_keys = cursor.fetchall()
-display_data(data["ews-data"][table], name=table)
-print(foreign_keys)
 
-print(data["ews-data"].keys())
+def _json_default(value):
+    # BLOB columns (e.g. presentation thumbnails) are exported as base64 text.
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_ready(df):
+    """turn NULLs into None and give nullable integer columns their ints back."""
+    # NULLs make pandas load integer columns as float64, convert_dtypes restores Int64.
+    df = df.convert_dtypes()
+    return df.astype(object).where(df.notna(), None)
+
+
+def to_json(data):
+    """serialize the loaded tables as compact json, one list per column."""
+    tables = {name: _json_ready(df).to_dict(orient="list") for name, df in data["ews-data"].items()}
+    # allow_nan=False makes a NaN that slipped through fail instead of writing invalid json.
+    return json.dumps({"ews-data": tables}, indent=None, separators=(",", ":"), default=_json_default, allow_nan=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the tables of an EasyWorship schedule database.")
+    parser.add_argument("--json", metavar="FILE", help="Export all tables as json to FILE.")
+    parser.add_argument("--debug", action="store_true", help="Pretty print the loaded data.")
+    args = parser.parse_args()
+
+    data = load_data(db_path)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(to_json(data))
+        print(f"Exported {len(data['ews-data'])} tables to {args.json}")
+    if args.debug:
+        pprint.pprint(data)
+
+    table= "file"
+    conn = sqlite3.connect(db_path)
+    foreign_keys = conn.execute(f"PRAGMA foreign_key_list({table});").fetchall()
+    # Close connection
+    conn.close()
+
+    display_data(data["ews-data"][table], name=table)
+    print(foreign_keys)
+
+    print(data["ews-data"].keys())
+
+
 
+    # print(data["ews-data"]["presentation"]["ready"])
+    # img = open_thumbnail(db_path, "presentation", data["ews-data"]["presentation"]["rowid"][1])
+    # img.show()
 
 
-# print(data["ews-data"]["presentation"]["ready"])
-# img = Image.open(BytesIO(data["ews-data"]["presentation"]["thumbnail"][1]))
-# img.show()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
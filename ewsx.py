@@ -3,121 +3,162 @@ import typing
 import os
 import posixpath
 import zipfile
-import tempfile
 import unzip
 import shutil
+import tempfile
+
+# template database used for new schedules.
+SAMPLE_DB = "./sample_files/main.db"
 
 class EWSXFIle():
     def __init__(self):
         self.existing_file = None
-
-    def save(self, filename: os.PathLike = None):
-        with zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED) as z:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # creating the media directory.
+        self._zip = None
+
+    def save(self, filename: os.PathLike = None, compression_level: int = 3):
+        """save the schedule, `compression_level` is the DEFLATE level (0-9)."""
+        if self.existing_file and not self._is_modified():
+            # nothing changed since `from_file`, the source archive can be copied as is.
+            if not (os.path.exists(filename) and os.path.samefile(self.existing_file, filename)):
+                shutil.copyfile(self.existing_file, filename)
+            print(f"Successfully saved schedule in `{posixpath.abspath(filename)}` ✅")
+            return
+
+        # write next to the target and swap it in, the source archive may be the target itself.
+        fd, tmp_path = tempfile.mkstemp(suffix=".ewsx", dir=os.path.dirname(os.path.abspath(filename)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compression_level) as z:
                 if not self.existing_file:
-                    os.mkdir(os.path.join(temp_dir, "media"))
-
-                    # creating the database file
-                    with open(os.path.join(temp_dir, "main.db"), "wb+") as f:
-                        f.write(open("./sample_files/main.db", "rb+").read())
+                    # creating the database file and the media directory.
+                    z.write(SAMPLE_DB, "main.db")
+                    z.writestr(zipfile.ZipInfo("media/"), b"")
                 else:
-                    for dir in self.dirs_list:
-                        os.makedirs(os.path.join(temp_dir, dir), exist_ok=True)
-                    for file in self.files_list:
-                        open(os.path.join(temp_dir, file[0]), "wb+").write(file[1])
-
-                for root, _, files in os.walk(temp_dir):
-                    for file in files:
-                        full_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(full_path, temp_dir)
-                        z.write(full_path, rel_path)
+                    for rel_path, data in self.files_list:
+                        if isinstance(data, bytes):
+                            # entries added by the caller hold their content directly.
+                            z.writestr(rel_path, data)
+                            continue
+                        # stream the members straight from the source archive.
+                        with self._zip.open(data) as src, \
+                                z.open(rel_path, "w", force_zip64=data.file_size > zipfile.ZIP64_LIMIT) as dst:
+                            shutil.copyfileobj(src, dst, length=1 << 20)
+
+            saving_over_source = self.existing_file and os.path.exists(filename) \
+                and os.path.samefile(self.existing_file, filename)
+            # mkstemp creates the file owner-only, give it the permissions a plain open() would.
+            if os.path.exists(filename):
+                shutil.copymode(filename, tmp_path)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_path, 0o666 & ~umask)
+            if saving_over_source:
+                # windows won't replace a file that is still open.
+                self.close()
+            os.replace(tmp_path, filename)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        if saving_over_source:
+            # the old member offsets are gone, read the schedule back from the new file.
+            self.from_file(filename)
         print(f"Successfully saved schedule in `{posixpath.abspath(filename)}` ✅")
 
     def from_file(self, filename):
         """expand from an already existing schedule file."""
+        self.close()
         self.files_list = []
-        self.dirs_list = []
         self.existing_file = filename
-        with tempfile.TemporaryDirectory() as output_dir:
-            unzip.ExpandEWSXFile(filename, output_dir)
-            for root, dirs, files in os.walk(output_dir):
-                for file in files:
-                    full_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(full_path, output_dir)
-                    self.files_list.append((rel_path, open(full_path, "rb+").read()))
-                
-                for dir in dirs:
-                    self.dirs_list.append(dir)
+        # members are read lazily from the archive instead of being expanded up front.
+        self._zip = unzip.OpenEWSXFile(filename)
+        dirs = {}
+        for info in self._zip.infolist():
+            # solve platform migration issue with paths.
+            rel_path = info.filename.replace("\\", "/")
+            if rel_path.endswith("/") or unzip.is_dir_entry(info):
+                parent = rel_path.rstrip("/")
+            else:
+                self.files_list.append((rel_path, info))
+                parent = posixpath.dirname(rel_path)
+            while parent and parent not in dirs:
+                dirs[parent] = None
+                parent = posixpath.dirname(parent)
+        self.dirs_list = list(dirs)
+        self._loaded = (list(self.files_list), list(self.dirs_list))
         return self
     
+    def close(self):
+        """release the source archive opened by `from_file`."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _is_modified(self) -> bool:
+        """whether files_list/dirs_list changed since the schedule was loaded."""
+        return self._loaded != (self.files_list, self.dirs_list)
+
     def expand_to_dir(self, output_dir: str = "schedules"):
         os.makedirs(output_dir, exist_ok=True)
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # creating the media directory.
-            if not self.existing_file:
-                os.mkdir(os.path.join(temp_dir, "media"))
-
-                # creating the database file
-                with open(os.path.join(temp_dir, "main.db"), "wb+") as f:
-                    f.write(open("./sample_files/main.db", "rb+").read())
-            else:
-                for dir in self.dirs_list:
-                    os.makedirs(os.path.join(temp_dir, dir), exist_ok=True)
-                for file in self.files_list:
-                    open(os.path.join(temp_dir, file[0]), "wb+").write(file[1])
-
-            num = len(os.listdir(output_dir)) + 1
-            schedule_path = os.path.join(output_dir, "schedule" + str(num))
-            os.makedirs(schedule_path, exist_ok=True)
-            for file in os.listdir(temp_dir):
-                if unzip.is_directory(file):
-                    dir_path = os.path.join(schedule_path, file)
-                    os.mkdir(dir_path)
-                    shutil.copytree(os.path.join(temp_dir, file), dir_path, dirs_exist_ok=True)
-                else:
-                    shutil.copy(os.path.join(temp_dir, file), schedule_path)
+        num = len(os.listdir(output_dir)) + 1
+        schedule_path = os.path.join(output_dir, "schedule" + str(num))
+        os.makedirs(schedule_path, exist_ok=True)
+
+        if not self.existing_file:
+            # creating the media directory and the database file.
+            os.mkdir(os.path.join(schedule_path, "media"))
+            shutil.copyfile(SAMPLE_DB, os.path.join(schedule_path, "main.db"))
+        else:
+            # dirs_list holds every parent directory, so one pass creates the whole tree.
+            for dir in self.dirs_list:
+                os.makedirs(f"{schedule_path}/{dir}", exist_ok=True)
+            for rel_path, data in self.files_list:
+                out_path = f"{schedule_path}/{rel_path}"
+                if isinstance(data, bytes):
+                    with open(out_path, "wb") as dst:
+                        dst.write(data)
+                    continue
+                with self._zip.open(data) as src, open(out_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, length=1 << 20)
         print(f"schedule expanded into `{posixpath.abspath(os.path.join(output_dir, schedule_path))}` ✅")
 
     def structure(self) -> str:
         """Returns the structure of the schedule file after decompressing."""
-        files_set = []
-        dirs_set = []
-
         if self.existing_file:
-            files_set = [x[0] for x in self.files_list]
-            dirs_set = self.dirs_list
+            dirs_list = self.dirs_list
+            # group the current files under their top level directory ("" for the root).
+            files_by_dir = {}
+            for rel_path, _ in self.files_list:
+                head, sep, tail = rel_path.partition("/")
+                files_by_dir.setdefault(head if sep else "", []).append(tail if sep else head)
         else:
-            dirs_set = ["media"]
-            files_set = ["main.db"]
-
-        
-        explored = []
-        struct = ""
-        for f in dirs_set + files_set:
-            if unzip.is_directory(f):
-                struct += f + "/" + "\n"
-                files = []
-                for x in files_set:
-                    if x.startswith(f):
-                        files.append(x.strip("/" + f))
-                        explored.append(x)
-                if files:
-                    struct += "    " + "\n    ".join(files) + "\n"
-            else:
-                if f not in explored:
-                    struct += f
-            explored.append(f)
-        return struct
+            dirs_list = ["media"]
+            files_by_dir = {"": ["main.db"]}
+
+        parts = []
+        for d in dirs_list:
+            parts.append(d + "/\n")
+            parts.extend("    " + f + "\n" for f in files_by_dir.get(d, ()))
+        parts.append("\n".join(files_by_dir.get("", ())))
+        return "".join(parts)
 
 
 def Create():
     """Create a new Easy Worship 7 schedule file object."""
     return EWSXFIle()
 
+def main():
+    with Create().from_file("./NewSchedule.ewsx") as schedule:
+        print(schedule.structure())
 
+    # schedule.save("data.ewsx")
 
-schedule = Create().from_file("./NewSchedule.ewsx")
-print(schedule.structure())
 
-# schedule.save("data.ewsx")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
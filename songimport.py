@@ -2,15 +2,21 @@ import os
 import sys
 import re
 import argparse
+from collections import deque
 import time
-from datetime import datetime
+import uuid
 import sqlite3
-import shutil
-import subprocess
+from pathlib import Path
 
 # Backup directory relative to the default EasyWorship path
 DEFAULT_BACKUP_DIR = r"./backups"
 
+# Backup names start with the Unix timestamp they were created at
+_BACKUP_TS_RE = re.compile(r"^(\d+)")
+
+# CRLF, lone CR and LF line breaks, each becomes one RTF \par
+_LINE_BREAK_RE = re.compile(r"\r\n?|\n")
+
 # Ensure the backup directory exists
 os.makedirs(DEFAULT_BACKUP_DIR, exist_ok=True)
 
@@ -22,20 +28,50 @@ def log(message, verbose=False):
 def search_for_databases_dir(root_dir, verbose=False):
     """Searches for the Databases folder in all subdirectories under the specified root directory."""
     log(f"Searching for Databases directory starting in: {root_dir}", verbose)
-    for root, dirs, files in os.walk(root_dir):
+    queue = deque([root_dir])
+    while queue:
+        root = queue.popleft()
         log(f"Checking directory: {root}", verbose)
-        if "Databases" in dirs:
-            db_dir = os.path.join(root, "Databases")
-            log(f"Found Databases directory at: {db_dir}", verbose)
-            return db_dir
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if entry.name == "Databases":
+                        log(f"Found Databases directory at: {entry.path}", verbose)
+                        return entry.path
+                    queue.append(entry.path)
+        except OSError as e:
+            log(f"Skipping directory {root}: {e}", verbose)
     log("Databases directory not found in the specified directory.", verbose)
     return None
 
+def open_db(db_path, timeout=5.0):
+    """
+    Connects to a SQLite database with pragmas tuned for the import workload.
+    Only per-connection pragmas are set, the journal mode EasyWorship uses is left alone,
+    and synchronous stays FULL since these are the user's live library files.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA cache_size=-65536;")
+    conn.execute("PRAGMA mmap_size=268435456;")
+    return conn
+
+def _open_ro_db(db_path, timeout=5.0):
+    """Connects to a SQLite database read-only, for the helpers that only inspect it."""
+    uri = Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, timeout=timeout)
+
+def _utf8_ci(x, y):
+    """UTF-8 case-insensitive comparison, lowering each side once."""
+    xl = x.lower()
+    yl = y.lower()
+    return (xl > yl) - (xl < yl)
+
 def register_utf8_ci_collation(connection):
     """Registers the custom UTF-8 case-insensitive collation sequence."""
-    def utf8_ci(x, y):
-        return (x.lower() > y.lower()) - (x.lower() < y.lower())
-    connection.create_collation("UTF8_U_CI", utf8_ci)
+    connection.create_collation("UTF8_U_CI", _utf8_ci)
 
 def get_db_paths(input_dir, verbose=False):
     """Returns the expected paths for Songs.db and SongWords.db from the specified input directory."""
@@ -45,15 +81,37 @@ def get_db_paths(input_dir, verbose=False):
     log(f"Input SongWords.db path: {songwords_db_path}", verbose)
     return songs_db_path, songwords_db_path
 
+def probe_db(db_path, integrity=False):
+    """
+    Opens a database once and returns (ok, locked, details).
+    Runs the cheap PRAGMA quick_check, or the full integrity_check when `integrity` is set.
+    """
+    check = "integrity_check" if integrity else "quick_check"
+    try:
+        conn = _open_ro_db(db_path, timeout=0.1)
+        # Songs.db indexes use this collation, the checks fail without it.
+        register_utf8_ci_collation(conn)
+        try:
+            result = conn.execute(f"PRAGMA {check};").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        return False, "locked" in str(e), str(e)
+    except sqlite3.Error as e:
+        return False, False, str(e)
+
+    details = result[0] if result else "Unknown"
+    return details == "ok", False, details
+
 def is_db_locked(db_path):
     """Checks if the database file is locked by attempting a PRAGMA quick_check."""
-    try:
-        conn = sqlite3.connect(db_path)
-        conn.execute("PRAGMA quick_check;")  # Basic check for database usability
-        conn.close()
-        return False  # Not locked
-    except sqlite3.OperationalError:
-        return True  # Locked
+    return probe_db(db_path)[1]
+
+def _copy_file(src, dst):
+    """Copies src to dst with shutil.copy2, which already uses the platform's fast copy call."""
+    import shutil  # only needed by backup/restore
+
+    shutil.copy2(src, dst)
 
 def create_backup(songs_db_path, songwords_db_path, verbose=False):
     """Creates backups for Songs.db and SongWords.db with a timestamped .bak extension."""
@@ -68,11 +126,11 @@ def create_backup(songs_db_path, songwords_db_path, verbose=False):
     songwords_backup_path = os.path.join(DEFAULT_BACKUP_DIR, songwords_backup_name)
 
     try:
-        shutil.copy2(songs_db_path, songs_backup_path)
+        _copy_file(songs_db_path, songs_backup_path)
         print(f"Songs.db backup created: {songs_backup_name}")
         log(f"Songs.db successfully backed up to: {songs_backup_path}", verbose)
 
-        shutil.copy2(songwords_db_path, songwords_backup_path)
+        _copy_file(songwords_db_path, songwords_backup_path)
         print(f"SongWords.db backup created: {songwords_backup_name}")
         log(f"SongWords.db successfully backed up to: {songwords_backup_path}", verbose)
 
@@ -90,26 +148,29 @@ def create_backup(songs_db_path, songwords_db_path, verbose=False):
     
 def list_backups(verbose=False):
     """Lists all backup files in the DEFAULT_BACKUP_DIR directory, including their human-readable timestamps."""
+    from datetime import datetime  # only needed for the backup listing
+
     print(f"Looking for backups in: {DEFAULT_BACKUP_DIR}")
     if not os.path.exists(DEFAULT_BACKUP_DIR):
         print("No backups found. Backup directory does not exist.")
         return
 
-    backups = [f for f in os.listdir(DEFAULT_BACKUP_DIR) if f.endswith(".bak")]
+    with os.scandir(DEFAULT_BACKUP_DIR) as it:
+        backups = [e for e in it if e.is_file() and e.name.endswith(".bak")]
     if backups:
         print("Available backups:")
-        for backup in backups:
-            backup_path = os.path.join(DEFAULT_BACKUP_DIR, backup)
+        for entry in backups:
+            backup = entry.name
             
             # Extract and convert Unix timestamp from the filename
             try:
-                timestamp = int(re.search(r"(\d+)", backup).group(1))
+                timestamp = int(_BACKUP_TS_RE.match(backup).group(1))
                 human_readable_time = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
             except (AttributeError, ValueError):
                 human_readable_time = "Unknown"
             
             # Get last modified time of the file
-            modified_time = os.path.getmtime(backup_path)
+            modified_time = entry.stat().st_mtime
             formatted_modified_time = datetime.fromtimestamp(modified_time).strftime("%Y-%m-%d %H:%M:%S")
 
             print(f" - {backup}")
@@ -135,13 +196,14 @@ def restore_backup(databases_dir, backup_file, verbose=False):
         print(f"Error: Backup file '{backup_file}' not found in the backups directory.")
         exit(1)
 
-    shutil.copy2(backup_path, restore_path)
+    _copy_file(backup_path, restore_path)
     print(f"Backup '{backup_file}' restored to: {restore_path}")
 
 def list_txt_files_in_dir(directory, verbose=False):
     """Returns a list of .txt files in the given directory."""
     log(f"Searching for .txt files in directory: {directory}", verbose)
-    txt_files = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".txt")]
+    with os.scandir(directory) as it:
+        txt_files = [e.path for e in it if e.is_file() and e.name.endswith(".txt")]
     log(f"Found .txt files: {txt_files}", verbose)
     return txt_files
 
@@ -152,7 +214,7 @@ def return_db_tables(db_path, verbose=False):
             print(f"\n--- Error: Database file not found at {db_path} ---")
             return
 
-        conn = sqlite3.connect(db_path)
+        conn = _open_ro_db(db_path)
         cursor = conn.cursor()
         
         # Query to select all table names from the sqlite_master table
@@ -174,7 +236,7 @@ def show_db_tables(db_path, verbose=False):
             print(f"\n--- Error: Database file not found at {db_path} ---")
             return
 
-        conn = sqlite3.connect(db_path)
+        conn = _open_ro_db(db_path)
         cursor = conn.cursor()
         
         # Query to select all table names from the sqlite_master table
@@ -197,6 +259,21 @@ def show_db_tables(db_path, verbose=False):
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def _write_rows(column_names, rows):
+    """Formats rows as an aligned table and writes it to stdout in one call."""
+    # Ensure we handle None/RTF strings gracefully
+    rendered = [
+        [item[:50] + '...' if isinstance(item, str) and len(item) > 50 else str(item) for item in row]
+        for row in rows
+    ]
+    col_widths = [max(len(name), *(len(r[i]) for r in rendered)) for i, name in enumerate(column_names)]
+    fmt = " | ".join(f"{{:<{w}}}" for w in col_widths)
+
+    header_line = fmt.format(*column_names)
+    lines = [header_line, "-" * len(header_line)]
+    lines.extend(fmt.format(*r) for r in rendered)
+    sys.stdout.write("\n".join(lines) + "\n")
+
 # --- NEW FUNCTION FOR DUMPING TABLE CONTENTS ---
 def show_table_contents(db_path, table_name):
     db_filename = os.path.basename(db_path)
@@ -206,7 +283,7 @@ def show_table_contents(db_path, table_name):
             print(f"\n--- Error: Database file not found at {db_path} ---")
             return
 
-        conn = sqlite3.connect(db_path)
+        conn = _open_ro_db(db_path)
         cursor = conn.cursor()
         
         # Check if the table exists
@@ -229,27 +306,7 @@ def show_table_contents(db_path, table_name):
             print("Table is empty or limit reached.")
             return
 
-        # Calculate maximum width for each column
-        col_widths = [len(col) for col in column_names]
-        for row in rows:
-            for i, item in enumerate(row):
-                # Ensure we handle None/RTF strings gracefully
-                item_str = str(item)[:50] + '...' if isinstance(item, str) and len(item) > 50 else str(item)
-                col_widths[i] = max(col_widths[i], len(item_str))
-        
-        # Format the header
-        header_line = " | ".join(f"{name:<{col_widths[i]}}" for i, name in enumerate(column_names))
-        print(header_line)
-        print("-" * len(header_line))
-
-        # Format the rows
-        for row in rows:
-            row_line = []
-            for i, item in enumerate(row):
-                item_str = str(item)[:50] + '...' if isinstance(item, str) and len(item) > 50 else str(item)
-                row_line.append(f"{item_str:<{col_widths[i]}}")
-            print(" | ".join(row_line))
-
+        _write_rows(column_names, rows)
         print(f"--- End of Dump for Table '{table_name}' ---")
         
     except sqlite3.OperationalError as e:
@@ -268,18 +325,18 @@ def dump_table_contents(db_path, table_name, limit=10, verbose=False):
             print(f"\n--- Error: Database file not found at {db_path} ---")
             return
 
-        conn = sqlite3.connect(db_path)
+        conn = _open_ro_db(db_path)
         cursor = conn.cursor()
         
-        # Check if the table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
+        # Query the data, the table name is quoted and the limit bound as a parameter
+        quoted_name = table_name.replace('"', '""')
+        try:
+            cursor.execute(f'SELECT * FROM "{quoted_name}" LIMIT ?', (limit,))
+        except sqlite3.OperationalError as e:
             conn.close()
-            return # Table not found in this DB, exit quietly
-
-        # Query the data
-        query = f"SELECT * FROM {table_name} LIMIT {limit}"
-        cursor.execute(query)
+            if "no such table" in str(e):
+                return # Table not found in this DB, exit quietly
+            raise
         
         rows = cursor.fetchall()
         column_names = [description[0] for description in cursor.description]
@@ -294,27 +351,7 @@ def dump_table_contents(db_path, table_name, limit=10, verbose=False):
         # Prepare for formatted printing (basic implementation)
         print(f"\n--- First {len(rows)} Rows of Table '{table_name}' in {db_filename} ---")
         
-        # Calculate maximum width for each column
-        col_widths = [len(col) for col in column_names]
-        for row in rows:
-            for i, item in enumerate(row):
-                # Ensure we handle None/RTF strings gracefully
-                item_str = str(item)[:50] + '...' if isinstance(item, str) and len(item) > 50 else str(item)
-                col_widths[i] = max(col_widths[i], len(item_str))
-        
-        # Format the header
-        header_line = " | ".join(f"{name:<{col_widths[i]}}" for i, name in enumerate(column_names))
-        print(header_line)
-        print("-" * len(header_line))
-
-        # Format the rows
-        for row in rows:
-            row_line = []
-            for i, item in enumerate(row):
-                item_str = str(item)[:50] + '...' if isinstance(item, str) and len(item) > 50 else str(item)
-                row_line.append(f"{item_str:<{col_widths[i]}}")
-            print(" | ".join(row_line))
-
+        _write_rows(column_names, rows)
         print(f"--- End of Dump for Table '{table_name}' ---")
         
     except sqlite3.OperationalError as e:
@@ -326,7 +363,7 @@ def dump_table_contents(db_path, table_name, limit=10, verbose=False):
 def log_database_state(db_path):
     """Logs the number of entries in the Songs and SongWords database."""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = _open_ro_db(db_path)
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM song;")
         song_count = cursor.fetchone()[0]
@@ -340,22 +377,12 @@ def log_database_state(db_path):
 def validate_database(db_path, verbose=False):
     """Validates the integrity of a database using PRAGMA integrity_check."""
     log(f"Validating database: {db_path}", verbose)
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA integrity_check;")
-        result = cursor.fetchone()
-        conn.close()
-
-        if result and result[0] == "ok":
-            log(f"Integrity check passed for {db_path}.", verbose)
-            return True
-        else:
-            log(f"Integrity check failed for {db_path}. Result: {result[0] if result else 'Unknown'}", verbose)
-            return False
-    except Exception as e:
-        log(f"Unexpected error during database validation: {e}", verbose)
-        return False
+    ok, _, details = probe_db(db_path, integrity=True)
+    if ok:
+        log(f"Integrity check passed for {db_path}.", verbose)
+    else:
+        log(f"Integrity check failed for {db_path}. Result: {details}", verbose)
+    return ok
 
 def test_db_connection(db_path, verbose=False):
     """
@@ -363,31 +390,27 @@ def test_db_connection(db_path, verbose=False):
     """
     log(f"Testing database connection for: {db_path}", verbose)
 
-    try:
-        conn = sqlite3.connect(db_path)
-        conn.execute("PRAGMA integrity_check;")
-        conn.close()
-        log(f"Database {db_path} integrity check passed.", verbose)
-        return True
-    except sqlite3.OperationalError as exc:
-        log(f"SQLite operational error: {exc}", verbose)
-        return False
-    except Exception as exc:
-        log(f"Unexpected error while testing database: {exc}", verbose)
-        return False
+    ok, locked, details = probe_db(db_path)
+    if ok:
+        log(f"Database {db_path} quick check passed.", verbose)
+    elif locked:
+        log(f"Database {db_path} is locked: {details}", verbose)
+    else:
+        log(f"Database {db_path} check failed: {details}", verbose)
+    return ok
     
 def process_song(lyrics, title, author, copyright, dbs_dir, output_dir=None):
     songs_db_path = os.path.join(dbs_dir, "Songs.db")
     songwords_db_path = os.path.join(dbs_dir, "SongWords.db")
 
     # Connect to Songs.db
-    conn_songs = sqlite3.connect(songs_db_path)
-    # Register a dummy collation since the original database expects it.
-    conn_songs.create_collation("UTF8_U_CI", lambda x, y: (x > y) - (x < y)) 
+    conn_songs = open_db(songs_db_path)
+    # Register the collation the original database expects.
+    register_utf8_ci_collation(conn_songs)
     cursor_songs = conn_songs.cursor()
 
     # Connect to SongWords.db
-    conn_songwords = sqlite3.connect(songwords_db_path)
+    conn_songwords = open_db(songwords_db_path)
     cursor_songwords = conn_songwords.cursor()
 
     content = lyrics
@@ -407,7 +430,7 @@ def process_song(lyrics, title, author, copyright, dbs_dir, output_dir=None):
             INSERT INTO song (song_item_uid, title, author, copyright)
             VALUES (?, ?, ?, ?)
         """, (
-            f"UID-{time.time_ns()}",  # Generate a unique ID
+            f"UID-{uuid.uuid4().hex}",  # Generate a unique ID
             title,
             author,  # Default Author
             copyright # Default Copyright
@@ -436,74 +459,128 @@ def process_song(lyrics, title, author, copyright, dbs_dir, output_dir=None):
 
 
 
+def _read_file(file_path):
+    """Reads a whole file with one os.read sized from os.fstat, plus the EOF check."""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = [os.read(fd, size)]
+        # Short reads are rare for regular files, keep going until EOF.
+        while chunks[-1]:
+            chunks.append(os.read(fd, 1 << 16))
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+def lyrics_to_rtf(text):
+    """Converts plain lyrics to the basic RTF EasyWorship stores, one \\par per line break."""
+    return "{\\rtf1\\ansi " + _LINE_BREAK_RE.sub(r"\\par ", text) + "}"
+
+def title_key(title):
+    """Folds a song title the way the UTF8_U_CI collation compares it."""
+    return title.lower()
+
+def open_song_dbs(songs_db_path, songwords_db_path):
+    """
+    Connects to Songs.db with SongWords.db attached as `sw`, so one transaction covers both.
+    In rollback-journal mode SQLite commits attached databases through a super-journal,
+    so songs and their lyrics land together or not at all.
+    """
+    conn = open_db(songs_db_path)
+    # Register the collation the original database expects.
+    register_utf8_ci_collation(conn)
+    conn.execute("ATTACH DATABASE ? AS sw", (songwords_db_path,))
+    return conn
+
+def insert_songs(conn, songs, verbose=False):
+    """
+    Inserts (title, author, copyright, rtf_lyrics) tuples through an open_song_dbs connection
+    in one transaction, skipping titles and lyrics that already exist.
+    Returns the number of songs and lyrics added.
+    """
+    cursor = conn.cursor()
+    # Take the write lock before reading what exists, so nothing changes in between.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Titles are keyed case-insensitively like the UTF8_U_CI title index, the first row wins.
+        song_ids = {}
+        for title, rowid in cursor.execute("SELECT title, rowid FROM song ORDER BY rowid"):
+            song_ids.setdefault(title_key(title), rowid)
+        songs_with_words = {song_id for (song_id,) in cursor.execute("SELECT song_id FROM sw.word")}
+
+        pending_songs = {}
+        pending_words = []
+        for title, author, copyright_, lyrics in songs:
+            key = title_key(title)
+            if key in song_ids or key in pending_songs:
+                log(f"Song '{title}' already exists in Songs.db. Skipping song insertion.", verbose)
+            else:
+                pending_songs[key] = (
+                    f"UID-{uuid.uuid4().hex}",  # Generate a unique ID
+                    title,
+                    author,
+                    copyright_
+                )
+            pending_words.append((key, title, lyrics))
+
+        # Insert the new songs, then read back their ids.
+        last_rowid = cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM song").fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO song (song_item_uid, title, author, copyright)
+            VALUES (?, ?, ?, ?)
+        """, pending_songs.values())
+        for title, rowid in cursor.execute("SELECT title, rowid FROM song WHERE rowid > ?", (last_rowid,)):
+            song_ids.setdefault(title_key(title), rowid)
+        log(f"Added {len(pending_songs)} songs to Songs.db.", verbose)
+
+        words_rows = []
+        for key, title, lyrics in pending_words:
+            song_id = song_ids[key]
+            # Check if the lyrics already exist in SongWords.db
+            if song_id in songs_with_words:
+                log(f"Lyrics for song '{title}' (ID: {song_id}) already exist in SongWords.db. Skipping word insertion.", verbose)
+                continue
+            songs_with_words.add(song_id)
+            words_rows.append((song_id, lyrics))
+
+        cursor.executemany("""
+            INSERT INTO sw.word (song_id, words)
+            VALUES (?, ?)
+        """, words_rows)
+        log(f"Added lyrics for {len(words_rows)} songs to SongWords.db.", verbose)
+
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return len(pending_songs), len(words_rows)
+
 def process_txt_files(file_paths, songs_db_path, songwords_db_path, output_dir=None, verbose=False):
     """Processes the provided .txt files and inserts them into Songs.db and SongWords.db."""
     log("Connecting to the SQLite databases.", verbose)
     
     try:
-        # Connect to Songs.db
-        conn_songs = sqlite3.connect(songs_db_path)
-        # Register a dummy collation since the original database expects it.
-        conn_songs.create_collation("UTF8_U_CI", lambda x, y: (x > y) - (x < y)) 
-        cursor_songs = conn_songs.cursor()
-
-        # Connect to SongWords.db
-        conn_songwords = sqlite3.connect(songwords_db_path)
-        cursor_songwords = conn_songwords.cursor()
+        conn = open_song_dbs(songs_db_path, songwords_db_path)
 
+        songs = []
         for file_path in file_paths:
             log(f"Processing file: {file_path}", verbose)
             try:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = file.read().strip()
-
-                    # Extract song title from the filename
-                    title = os.path.basename(file_path).replace(".txt", "").strip()
-
-                    # Convert lyrics to basic RTF format
-                    lyrics = f"{{\\rtf1\\ansi {content.replace('\n', '\\par ')}}}"
-
-                    # Check if the song already exists in Songs.db
-                    cursor_songs.execute("SELECT rowid FROM song WHERE title = ?", (title,))
-                    song_row = cursor_songs.fetchone()
-                    if song_row:
-                        song_id = song_row[0]
-                        log(f"Song '{title}' already exists in Songs.db. Skipping song insertion.", verbose)
-                    else:
-                        # Insert new song into Songs.db
-                        cursor_songs.execute("""
-                            INSERT INTO song (song_item_uid, title, author, copyright)
-                            VALUES (?, ?, ?, ?)
-                        """, (
-                            f"UID-{time.time_ns()}",  # Generate a unique ID
-                            title,
-                            "Unknown",  # Default Author
-                            "Public Domain" # Default Copyright
-                        ))
-                        song_id = cursor_songs.lastrowid
-                        log(f"Song '{title}' added to Songs.db with ID: {song_id}", verbose)
-
-                    # Check if the lyrics already exist in SongWords.db
-                    cursor_songwords.execute("SELECT 1 FROM word WHERE song_id = ?", (song_id,))
-                    if cursor_songwords.fetchone():
-                        log(f"Lyrics for song '{title}' (ID: {song_id}) already exist in SongWords.db. Skipping word insertion.", verbose)
-                        continue
-
-                    # Insert lyrics into SongWords.db
-                    cursor_songwords.execute("""
-                        INSERT INTO word (song_id, words)
-                        VALUES (?, ?)
-                    """, (song_id, lyrics))
-                    log(f"Lyrics for song '{title}' added to SongWords.db successfully.", verbose)
+                content = _read_file(file_path).decode("utf-8").strip()
 
+                # Convert lyrics to basic RTF format, CRLF and lone CR count as line breaks like in text mode.
+                lyrics = lyrics_to_rtf(content)
             except Exception as e:
                 log(f"Error processing file {file_path}: {e}", verbose)
+                continue
+
+            # Extract song title from the filename
+            title = os.path.basename(file_path).replace(".txt", "").strip()
+            songs.append((title, "Unknown", "Public Domain", lyrics))  # Default Author and Copyright
 
-        # Commit changes and close connections
-        conn_songs.commit()
-        conn_songwords.commit()
-        conn_songs.close()
-        conn_songwords.close()
+        # Insert all new songs and lyrics in one transaction, then close the connection
+        insert_songs(conn, songs, verbose)
+        conn.close()
     except Exception as e:
         print(f"Error: Could not process files. {e}")
 
@@ -1,51 +1,96 @@
 import zipfile
 import os
+import shutil
 from pathlib import Path
 import platform
+from concurrent.futures import ThreadPoolExecutor
+
+# already compressed media formats, written to schedules without deflate.
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.mp4', '.mov', '.mp3', '.ogg', '.m4a', '.webp', '.gif'}
 
 def _update_crc(self, data):
     pass
 
 
-def is_directory(name):
-    if name.endswith("/") or name.endswith("\\"):
-        return True
-    
-    if "." not in os.path.basename(name):
-        return True
-    return False
-
+def is_dir_entry(info):
+    # EasyWorship stores directories without a trailing "/", flagged only by the MS-DOS directory attribute.
+    return info.is_dir() or bool(info.external_attr & 0x10)
 
 
-def ExpandEWSXFile(filepath, output_dir):
+def OpenEWSXFile(filepath):
+    """Open a schedule file for reading without expanding it."""
     zipfile.ZipExtFile._update_crc = _update_crc # avoid stric crc validation.
-    with zipfile.ZipFile(filepath, "r") as z:
-        for file in z.namelist():
-            out_path = os.path.join(output_dir, f"{file}")
-            
-            if is_directory(file):
-                os.makedirs(out_path, exist_ok=True)
-                continue
+    return zipfile.ZipFile(filepath, "r")
 
-            os.makedirs(os.path.dirname(out_path), exist_ok=True)
-            
+
+def _extract_files(filepath, output_dir, infos):
+    # each worker reads through its own ZipFile, they are not safe to share between threads.
+    with OpenEWSXFile(filepath) as z:
+        for info in infos:
+            file = info.filename
             try:
                 # solve platform migration issue with paths.
                 out_file = os.path.normpath(file).replace("\\", "/") if platform.system() == "Darwin" else file 
                 out_path = os.path.join(output_dir, f"{out_file}")
-                with z.open(file) as source, open(out_path, "wb+") as target:
-                    target.write(source.read())
+                with z.open(info) as source, open(out_path, "wb") as target:
+                    shutil.copyfileobj(source, target, length=1 << 20)
             except Exception as e:
                 print(f"Error extracting {file}: {e}")
 
 
+def ExpandEWSXFile(filepath, output_dir):
+    files = []
+    dirs = set()
+    with OpenEWSXFile(filepath) as z:
+        for info in z.infolist():
+            out_path = os.path.join(output_dir, f"{info.filename}")
+            
+            if is_dir_entry(info):
+                dirs.add(out_path)
+                continue
+
+            dirs.add(os.path.dirname(out_path))
+            files.append(info)
+
+    # create each directory once, up front, so the workers never race on them.
+    for dir_path in sorted(dirs, key=len):
+        os.makedirs(dir_path, exist_ok=True)
+
+    # zlib releases the GIL while inflating, so entries decompress in parallel.
+    workers = min(os.cpu_count() or 1, len(files)) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_extract_files, [filepath] * workers, [output_dir] * workers,
+                          [files[i::workers] for i in range(workers)]))
+
+
+def _scan_files(directory):
+    """Recursively yields the file entries under `directory`."""
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                else:
+                    yield entry
+
+
 def createEWSXFile(unzipped_dir_path, output_file):
+    unzipped_dir_path = os.path.normpath(unzipped_dir_path)
+    base_len = len(unzipped_dir_path) + 1
+    files = list(_scan_files(unzipped_dir_path))
     with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as z:
-        for root, dirs, files in os.walk(unzipped_dir_path):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, unzipped_dir_path)
-                z.write(full_path, rel_path)       
+        for entry in files:
+            # fixed timestamp, so no extra stat per file for its mtime.
+            info = zipfile.ZipInfo(entry.path[base_len:], date_time=(1980, 1, 1, 0, 0, 0))
+            # media is already compressed, deflating it again only costs time.
+            if os.path.splitext(entry.name)[1].lower() in STORED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = entry.stat().st_size
+            with open(entry.path, "rb") as source, z.open(info, "w") as target:
+                shutil.copyfileobj(source, target, length=1 << 20)
     print("Created: ", output_file)
         
         